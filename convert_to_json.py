@@ -1,35 +1,79 @@
 # convert_to_json_fixed.py
+import concurrent.futures
 import json
+import sys
+import orjson
 import numpy as np
 import joblib
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import os
 from sklearn.preprocessing import StandardScaler
 
+# 支持的语言，固定顺序——所有函数和下游JS都按这个索引序
+LANGUAGES = ('en', 'zh', 'es', 'fr', 'ru', 'ar')
+
+# 转换的全部输入文件，用于mtime缓存判断
+INPUT_FILES = (
+    'job_names.arrow',
+    *(f'job_{lang}.npy' for lang in LANGUAGES),
+    'job_codes.npy',
+    'pca_weights.npy',
+    'scaled_job_features.npy',
+    'questions.tsv',
+    'meanNorms.tsv',
+    'sdNorms.tsv',
+    'weightsB5.tsv',
+    'text_dict.npy',
+    'language_display.npy',
+    'your_scaler.pkl',
+)
+
 def load_multilingual_jobs():
     """加载所有语言的职业名称"""
     print("Loading multilingual job files...")
-    
-    languages = ['en', 'zh', 'es', 'fr', 'ru', 'ar']
-    job_translations = {}
-    
-    for lang in languages:
-        filepath = f"job_{lang}.npy"
+
+    # 优先读列式Arrow IPC文件：单次mmap打开全部6种语言
+    # （逐文件的job_*.npy unicode数组是numpy里最慢的字符串容器）
+    try:
+        with pa.memory_map('job_names.arrow') as source:
+            tbl = pa.ipc.open_file(source).read_all()
+        job_translations = {lang: tbl.column(lang).to_pylist()
+                            for lang in tbl.column_names}
+        print(f"  ✅ job_names.arrow - {tbl.num_rows} jobs × {len(tbl.column_names)} languages")
+        if tbl.num_rows > 0:
+            print(f"    示例: {job_translations['en'][:3]}")
+        return job_translations
+    except FileNotFoundError:
+        print("  ⚠️ job_names.arrow not found, falling back to job_*.npy")
+
+    def _load_one(lang):
         try:
-            data = np.load(filepath, allow_pickle=True)
-            job_list = data.tolist()
-            job_translations[lang] = job_list
-            print(f"  ✅ {filepath} - {len(job_list)} jobs")
-            
-            # 显示示例
-            if len(job_list) > 0:
-                print(f"    示例: {job_list[:3]}")
+            return lang, np.load(f"job_{lang}.npy", allow_pickle=True).tolist()
         except FileNotFoundError:
-            print(f"  ❌ {filepath} not found")
+            return lang, None
+
+    # 六个语言文件互不相关，并行读取，总耗时从sum(per-file)降为max(per-file)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=6) as ex:
+        results = dict(ex.map(_load_one, LANGUAGES))
+
+    job_translations = {}
+    for lang in LANGUAGES:
+        job_list = results[lang]
+        if job_list is None:
+            print(f"  ❌ job_{lang}.npy not found")
             job_translations[lang] = []
+            continue
+        job_translations[lang] = job_list
+        print(f"  ✅ job_{lang}.npy - {len(job_list)} jobs")
+
+        # 显示示例
+        if len(job_list) > 0:
+            print(f"    示例: {job_list[:3]}")
     
     # 验证所有语言文件长度一致
-    lengths = [len(job_translations[lang]) for lang in languages if lang in job_translations]
+    lengths = [len(job_translations[lang]) for lang in LANGUAGES if lang in job_translations]
     if lengths and len(set(lengths)) > 1:
         print(f"⚠️ 警告: 语言文件长度不一致: {lengths}")
     
@@ -43,7 +87,8 @@ def load_base_job_data():
     
     # 加载职业代码
     try:
-        job_codes = np.load("job_codes.npy", allow_pickle=True).tolist()
+        # 普通<U11数组，不含Python对象，无需走pickle路径
+        job_codes = np.load("job_codes.npy", allow_pickle=False).tolist()
         base_data['job_codes'] = job_codes
         print(f"  ✅ job_codes.npy - {len(job_codes)} codes")
         print(f"    示例: {job_codes[:5]}")
@@ -51,18 +96,20 @@ def load_base_job_data():
         print("  ❌ job_codes.npy not found")
         base_data['job_codes'] = []
     
-    # 加载PCA权重
+    # 加载PCA权重（保持ndarray，orjson直接从C缓冲区序列化）
+    # mmap_mode避免整块读入，ascontiguousarray按需拷贝为float32的普通ndarray
     try:
-        pca_weights = np.load("pca_weights.npy", allow_pickle=True).tolist()
+        pca_weights = np.ascontiguousarray(np.load("pca_weights.npy", mmap_mode='r'), dtype=np.float32)
         base_data['pca_weights'] = pca_weights
-        print(f"  ✅ pca_weights.npy - shape: {np.array(pca_weights).shape if pca_weights else 'N/A'}")
+        print(f"  ✅ pca_weights.npy - shape: {pca_weights.shape}")
     except FileNotFoundError:
         print("  ❌ pca_weights.npy not found")
         base_data['pca_weights'] = []
-    
-    # 加载职业特征
+
+    # 加载职业特征（保持ndarray；文件是Fortran序，orjson要求C连续）
+    # float32对人格特质打分精度足够，JSON文本也更短
     try:
-        scaled_features = np.load("scaled_job_features.npy", allow_pickle=True).tolist()
+        scaled_features = np.ascontiguousarray(np.load("scaled_job_features.npy", mmap_mode='r'), dtype=np.float32)
         base_data['scaled_features'] = scaled_features
         print(f"  ✅ scaled_job_features.npy - {len(scaled_features)} jobs")
     except FileNotFoundError:
@@ -75,21 +122,27 @@ def load_questions():
     """加载问题数据"""
     print("\nLoading questions.tsv...")
     
-    languages = ['en', 'zh', 'es', 'fr', 'ru', 'ar']
     questions_dict = {}
     
     try:
-        questions_df = pd.read_csv('questions.tsv', sep='\t')
+        # Arrow的CSV解析器是多线程C++，转pandas零拷贝
+        questions_df = pacsv.read_csv(
+            'questions.tsv', parse_options=pacsv.ParseOptions(delimiter='\t')).to_pandas()
         print(f"  ✅ Loaded questions.tsv - {len(questions_df)} questions")
         
-        for lang in languages:
+        # 英文回退列表只算一次，所有缺失语言共用
+        # fillna('')之后列里已全是字符串，无需再astype(str)逐格转换
+        en_fallback = (questions_df['en'].fillna('').to_list()
+                       if 'en' in questions_df.columns else [])
+
+        for lang in LANGUAGES:
             if lang in questions_df.columns:
-                questions = questions_df[lang].fillna('').astype(str).tolist()
+                questions = questions_df[lang].fillna('').to_list()
                 questions_dict[lang] = questions
                 print(f"    ✅ {lang}: {len(questions)} questions")
             else:
                 print(f"    ⚠️ {lang} not found, using English")
-                questions_dict[lang] = questions_df['en'].fillna('').astype(str).tolist()
+                questions_dict[lang] = en_fallback
         
         return questions_dict, len(questions_df)
     
@@ -104,13 +157,12 @@ def convert_tsv_files():
     tsv_data = {}
     
     try:
-        # 加载meanNorms.tsv
-        mean_norms = pd.read_csv('meanNorms.tsv', sep='\t')
-        mean_norms_json = {}
-        for idx, row in mean_norms.iterrows():
-            group = int(row['group'])
-            values = row[1:].tolist()
-            mean_norms_json[group] = values
+        # 加载meanNorms.tsv（批量取numpy数组，避免iterrows逐行构造Series）
+        mean_norms = pacsv.read_csv(
+            'meanNorms.tsv', parse_options=pacsv.ParseOptions(delimiter='\t')).to_pandas()
+        mean_values = mean_norms.drop(columns=['group']).to_numpy()
+        mean_norms_json = {int(g): mean_values[i].tolist()
+                           for i, g in enumerate(mean_norms['group'].to_numpy())}
         tsv_data['mean_norms'] = mean_norms_json
         print(f"  ✅ meanNorms.tsv - {len(mean_norms_json)} groups")
     except FileNotFoundError:
@@ -118,13 +170,12 @@ def convert_tsv_files():
         tsv_data['mean_norms'] = {}
     
     try:
-        # 加载sdNorms.tsv
-        sd_norms = pd.read_csv('sdNorms.tsv', sep='\t')
-        sd_norms_json = {}
-        for idx, row in sd_norms.iterrows():
-            group = int(row['group'])
-            values = row[1:].tolist()
-            sd_norms_json[group] = values
+        # 加载sdNorms.tsv（同上，批量转换）
+        sd_norms = pacsv.read_csv(
+            'sdNorms.tsv', parse_options=pacsv.ParseOptions(delimiter='\t')).to_pandas()
+        sd_values = sd_norms.drop(columns=['group']).to_numpy()
+        sd_norms_json = {int(g): sd_values[i].tolist()
+                         for i, g in enumerate(sd_norms['group'].to_numpy())}
         tsv_data['sd_norms'] = sd_norms_json
         print(f"  ✅ sdNorms.tsv - {len(sd_norms_json)} groups")
     except FileNotFoundError:
@@ -132,9 +183,13 @@ def convert_tsv_files():
         tsv_data['sd_norms'] = {}
     
     try:
-        # 加载weightsB5.tsv
-        weights = pd.read_csv('weightsB5.tsv', sep='\t')
-        tsv_data['weights'] = weights.values.tolist()
+        # 加载weightsB5.tsv（纯数值矩阵，直接从Arrow列拼numpy，不经过pandas）
+        weights_tbl = pacsv.read_csv(
+            'weightsB5.tsv', parse_options=pacsv.ParseOptions(delimiter='\t'))
+        tsv_data['weights'] = np.ascontiguousarray(
+            np.column_stack([weights_tbl.column(name).to_numpy()
+                             for name in weights_tbl.column_names]),
+            dtype=np.float32)
         print(f"  ✅ weightsB5.tsv - {len(tsv_data['weights'])} questions × 5 traits")
     except FileNotFoundError:
         print("  ❌ weightsB5.tsv not found")
@@ -149,10 +204,11 @@ def load_scaler():
     try:
         scaler = joblib.load("your_scaler.pkl")
         
+        # 保持ndarray，序列化时由orjson直接处理
         scaler_params = {
-            "mean": scaler.mean_.tolist() if hasattr(scaler, 'mean_') else [],
-            "scale": scaler.scale_.tolist() if hasattr(scaler, 'scale_') else [],
-            "var": scaler.var_.tolist() if hasattr(scaler, 'var_') else [],
+            "mean": scaler.mean_ if hasattr(scaler, 'mean_') else [],
+            "scale": scaler.scale_ if hasattr(scaler, 'scale_') else [],
+            "var": scaler.var_ if hasattr(scaler, 'var_') else [],
             "n_samples_seen": int(scaler.n_samples_seen_) if hasattr(scaler, 'n_samples_seen_') else 0,
             "feature_names": ["Neuroticism", "Extraversion", "Openness", "Agreeableness", "Conscientiousness"]
         }
@@ -174,7 +230,7 @@ def load_other_files():
         text_dict = np.load("text_dict.npy", allow_pickle=True).item()
         other_data['text_dict'] = text_dict
         print("  ✅ text_dict.npy loaded")
-    except:
+    except FileNotFoundError:
         print("  ❌ text_dict.npy not found")
         other_data['text_dict'] = {}
     
@@ -182,7 +238,7 @@ def load_other_files():
         language_display = np.load("language_display.npy", allow_pickle=True).item()
         other_data['language_display'] = language_display
         print("  ✅ language_display.npy loaded")
-    except:
+    except FileNotFoundError:
         print("  ❌ language_display.npy not found")
         other_data['language_display'] = {}
     
@@ -273,8 +329,9 @@ def get_metadata():
             "weightsB5.tsv",
             "your_scaler.pkl"
         ],
-        "languages_supported": ['en', 'zh', 'es', 'fr', 'ru', 'ar'],
+        "languages_supported": list(LANGUAGES),
         "n_jobs": 263,
+        "feature_dtype": "float32",
         "model_info": {
             "name": "JobRecommenderMLP",
             "input_dim": 5,
@@ -283,31 +340,63 @@ def get_metadata():
         }
     }
 
-def convert_all_data():
-    """主函数：转换所有数据到JSON格式"""
+def stream_dump(data, fh, option=0):
+    """按顶层键逐个编码写入JSON对象
+
+    orjson.dumps一次性返回整个文件的bytes，写入时峰值RSS约为文件大小的2倍；
+    逐键编码后峰值只需容纳最大的单个值。顶层键只有约20个，循环开销可忽略。
+    """
+    fh.write(b"{")
+    for i, (key, value) in enumerate(data.items()):
+        if i:
+            fh.write(b",")
+        fh.write(orjson.dumps(key, option=option))
+        fh.write(b":")
+        fh.write(orjson.dumps(value, option=option))
+    fh.write(b"}")
+
+def convert_all_data(pretty=False):
+    """主函数：转换所有数据到JSON格式
+
+    pretty=True时输出带缩进（调试用），默认紧凑格式——
+    缩进空白会让文件膨胀30-60%，浏览器解析也更慢。
+    """
     print("=" * 60)
     print("Converting all data to JSON format...")
     print("=" * 60)
-    
+
+    # 输入都没变且产物齐全时直接跳过重建（前端迭代时秒级变毫秒级）
+    stamp = {p: os.path.getmtime(p) for p in INPUT_FILES if os.path.exists(p)}
+    stamp["__pretty__"] = pretty
+    stamp_file = "app_data_complete.json.stamp"
+    outputs = ("app_data_complete.json", "app_data_compact.json", "app_data_features.bin")
+    if all(os.path.exists(p) for p in outputs) and os.path.exists(stamp_file):
+        try:
+            with open(stamp_file, "rb") as f:
+                if orjson.loads(f.read()) == stamp:
+                    print("✅ Cache hit: inputs unchanged, skipping conversion")
+                    return "app_data_complete.json", None
+        except (orjson.JSONDecodeError, OSError):
+            pass
+
     try:
-        # 1. 加载多语言职业名称
-        job_translations = load_multilingual_jobs()
-        
-        # 2. 加载基础职业数据
-        base_data = load_base_job_data()
-        
-        # 3. 加载其他文件
-        other_data = load_other_files()
-        
-        # 4. 加载问题数据
-        questions_dict, n_questions = load_questions()
-        
-        # 5. 加载TSV数据
-        tsv_data = convert_tsv_files()
-        
-        # 6. 加载Scaler
-        scaler_params = load_scaler()
-        
+        # 1-6. 六个加载器读取互不相关的文件，I/O为主（numpy/pandas读文件时
+        # 释放GIL），用线程池并行执行；打印输出可能交错
+        with concurrent.futures.ThreadPoolExecutor(max_workers=6) as ex:
+            f_jobs = ex.submit(load_multilingual_jobs)
+            f_base = ex.submit(load_base_job_data)
+            f_other = ex.submit(load_other_files)
+            f_questions = ex.submit(load_questions)
+            f_tsv = ex.submit(convert_tsv_files)
+            f_scaler = ex.submit(load_scaler)
+
+        job_translations = f_jobs.result()
+        base_data = f_base.result()
+        other_data = f_other.result()
+        questions_dict, n_questions = f_questions.result()
+        tsv_data = f_tsv.result()
+        scaler_params = f_scaler.result()
+
         # 7. 获取翻译文本
         translations = get_translation_texts()
         
@@ -321,8 +410,7 @@ def convert_all_data():
             "job_translations": job_translations,  # 多语言职业名称
             "job_codes": base_data.get('job_codes', []),
             "pca_weights": base_data.get('pca_weights', []),
-            "scaled_features": base_data.get('scaled_features', []),
-            
+
             # 向后兼容：使用英文作为默认职业名称
             "job_names": job_translations.get('en', []),
             
@@ -358,17 +446,41 @@ def convert_all_data():
             }
         }
         
-        # 9. 保存为JSON文件
+        # 9. 特征矩阵以二进制sidecar输出，JSON只保留形状/类型元数据
+        # JSON文本编码每个float要15-20字节，二进制只要4字节，且JS端免解析
+        scaled_features = base_data.get('scaled_features', [])
+        if len(scaled_features):
+            features_bin = "app_data_features.bin"
+            with open(features_bin, "wb") as f:
+                f.write(np.ascontiguousarray(scaled_features, dtype=np.float32).tobytes())
+            complete_data["metadata"]["scaled_features_bin"] = {
+                "file": features_bin,
+                "shape": list(np.shape(scaled_features)),
+                "dtype": "float32"
+            }
+            print(f"\n✅ Features written to {features_bin} ({os.path.getsize(features_bin) / 1024:.2f} KB)")
+
+        # 10. 保存为JSON文件
         print("\nSaving to JSON file...")
         output_file = "app_data_complete.json"
         
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(complete_data, f, ensure_ascii=False, indent=2)
+        # orjson 直接输出UTF-8字节，无需ensure_ascii
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        with open(output_file, "wb") as f:
+            if pretty:
+                # 调试路径：整体缩进输出，不走流式（分块编码会破坏缩进层级）
+                f.write(orjson.dumps(complete_data, option=option | orjson.OPT_INDENT_2))
+            else:
+                stream_dump(complete_data, f, option=option)
         
         print(f"✅ Successfully saved to {output_file}")
         print(f"📁 File size: {os.path.getsize(output_file) / 1024 / 1024:.2f} MB")
+
+        # 记录本次输入的mtime快照，供下次跳过重建
+        with open(stamp_file, "wb") as f:
+            f.write(orjson.dumps(stamp))
         
-        # 10. 打印摘要
+        # 11. 打印摘要
         print("\n" + "=" * 60)
         print("📊 Data Summary:")
         print("=" * 60)
@@ -377,7 +489,7 @@ def convert_all_data():
         print(f"   • Total Jobs: {n_jobs}")
         print(f"   • Total Questions: {n_questions}")
         print(f"   • Languages Available: {len(complete_data.get('job_translations', {}))}")
-        print(f"   • Job Features: {len(complete_data.get('scaled_features', []))}")
+        print(f"   • Job Features: {len(scaled_features)}")
         print(f"   • Norm Groups: 4")
         print(f"   • Question Languages: {list(questions_dict.keys())}")
         
@@ -385,38 +497,38 @@ def convert_all_data():
         print("\n🔍 Data Validation:")
         print(f"   • Job translations: {all(len(v) == n_jobs for v in complete_data.get('job_translations', {}).values())}")
         print(f"   • Job codes: {len(complete_data.get('job_codes', [])) == n_jobs}")
-        print(f"   • Scaled features: {len(complete_data.get('scaled_features', [])) == n_jobs}")
+        print(f"   • Scaled features: {len(scaled_features) == n_jobs}")
         
         # 显示示例
         print("\n👀 Example Data (first 3 jobs in each language):")
-        for lang in ['en', 'zh', 'es', 'fr', 'ru', 'ar']:
+        for lang in LANGUAGES:
             if lang in complete_data.get('job_translations', {}):
                 jobs = complete_data['job_translations'][lang][:3]
                 print(f"   • {lang.upper()}: {jobs}")
         
-        return output_file
-        
+        return output_file, complete_data
+
     except Exception as e:
         print(f"\n❌ Error during conversion: {e}")
         import traceback
         traceback.print_exc()
-        return None
+        return None, None
 
-def create_compact_version():
-    """创建压缩版本，减少文件大小"""
+def create_compact_version(full_data):
+    """创建压缩版本，减少文件大小
+
+    直接复用convert_all_data构建好的complete_data，
+    省掉对app_data_complete.json的一次完整重读和解析。
+    """
     print("\n" + "=" * 60)
     print("Creating compact version...")
     print("=" * 60)
-    
+
     try:
-        with open("app_data_complete.json", "r", encoding="utf-8") as f:
-            full_data = json.load(f)
-        
         # 创建压缩版本，移除不需要的字段
         compact_data = {
             "job_translations": full_data.get("job_translations", {}),
             "job_codes": full_data.get("job_codes", []),
-            "scaled_features": full_data.get("scaled_features", []),
             "pca_weights": full_data.get("pca_weights", []),
             "questions": full_data.get("questions", {}),
             "mean_norms": full_data.get("mean_norms", {}),
@@ -430,12 +542,15 @@ def create_compact_version():
             "metadata": {
                 "n_jobs": len(full_data.get("job_translations", {}).get("en", [])),
                 "n_questions": len(full_data.get("questions", {}).get("en", [])),
-                "languages": list(full_data.get("job_translations", {}).keys())
+                "languages": list(full_data.get("job_translations", {}).keys()),
+                # 特征矩阵在二进制sidecar里，压缩版共用同一个文件
+                "scaled_features_bin": full_data.get("metadata", {}).get("scaled_features_bin")
             }
         }
         
-        with open("app_data_compact.json", "w", encoding="utf-8") as f:
-            json.dump(compact_data, f, ensure_ascii=False, separators=(',', ':'))
+        with open("app_data_compact.json", "wb") as f:
+            stream_dump(compact_data, f,
+                        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
         
         print(f"✅ Compact version saved to app_data_compact.json")
         print(f"📁 File size: {os.path.getsize('app_data_compact.json') / 1024:.2f} KB")
@@ -444,12 +559,13 @@ def create_compact_version():
         print(f"❌ Failed to create compact version: {e}")
 
 if __name__ == "__main__":
-    # 转换完整数据
-    output_file = convert_all_data()
-    
+    # 转换完整数据（--pretty输出带缩进的JSON，便于调试）
+    output_file, complete_data = convert_all_data(pretty="--pretty" in sys.argv[1:])
+
     if output_file:
-        # 创建压缩版本
-        create_compact_version()
+        # 创建压缩版本（复用内存中的完整数据；缓存命中时压缩版也是现成的）
+        if complete_data is not None:
+            create_compact_version(complete_data)
         
         print("\n" + "=" * 60)
         print("🎉 All conversions complete!")